@@ -2,26 +2,157 @@ import json
 import boto3
 import os
 import base64
-import requests
+import threading
+import time
+
+from botocore.config import Config
+from botocore.exceptions import ClientError
+# urllib3 já vem carregado pelo botocore: usar ele no lugar do requests
+# tira um import inteiro do cold start
+import urllib3
+
+try:
+    from snapshot_restore_py import register_after_restore
+except ImportError:
+    register_after_restore = None
 
 API_ENDPOINT = os.environ['API_ENDPOINT']
 
+MODEL_ID = "anthropic.claude-3-haiku-20240307-v1:0"
+
+KOKORO_URL = "http://kokorotts.oraculo:8880/v1/audio/speech"  # ou IP privado da EC2
+KOKORO_VOICE = "pm_santa"
+
+# O system prompt manda a Kora abrir a conversa com esta frase; o áudio
+# dela é renderizado no init e vai na frente do resto da resposta
+GREETING_TEXT = "Oi, prazer, eu sou Kora! Estou aqui para aprendermos juntos e também para brincar! Qual o seu nome?"
 
+WARM_UP_TIMEOUT = 4
 
 
 try:
     gatewayapi = boto3.client("apigatewaymanagementapi", endpoint_url=API_ENDPOINT)
-    bedrock_runtime_client = boto3.client("bedrock-runtime", region_name="us-east-1")
-    polly_client = boto3.client("polly", region_name="us-east-1")
+    bedrock_runtime_client = boto3.client("bedrock-runtime", region_name="us-east-1", config=Config(connect_timeout=2))
 except Exception as e:
     print(f"Erro ao inicializar clientes AWS: {e}")
     gatewayapi = None
     bedrock_runtime_client = None
-    polly_client = None
+
+# pool HTTP reaproveitado entre invocações (mantém a conexão com o Kokoro)
+http = urllib3.PoolManager()
+
+# PCM da saudação, preenchido no init
+greeting_pcm = None
+
+
+def _kokoro_request(text, timeout):
+    # sem retries: um POST que falhou não é repetido no Kokoro
+    return http.request(
+        "POST",
+        KOKORO_URL,
+        body=json.dumps({
+            "model": "kokoro",
+            "voice": KOKORO_VOICE,
+            "input": text,
+            "response_format": "pcm",
+            "speed": 1.0
+        }).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        preload_content=False,
+        timeout=timeout,
+        retries=False,
+    )
+
+
+def _stream_kokoro(text, chunk_size):
+    r = _kokoro_request(text, urllib3.Timeout(connect=2, read=60))
+    try:
+        if r.status >= 400:
+            # lê o corpo do erro para a conexão voltar limpa ao pool
+            r.drain_conn()
+            raise RuntimeError(f"Kokoro respondeu HTTP {r.status}")
+        yield from r.stream(chunk_size)
+    except GeneratorExit:
+        # quem consumia parou no meio do áudio: a conexão ainda tem
+        # dados não lidos, então é descartada em vez de reaproveitada
+        r.close()
+        raise
+    finally:
+        r.release_conn()
+
+
+def _kokoro_chunks(text, chunk_size=4096):
+    """Gera o áudio PCM em pedaços; a saudação sai do cache do init."""
+    stripped = text.lstrip()
+    if greeting_pcm is not None and stripped.startswith(GREETING_TEXT):
+        for start in range(0, len(greeting_pcm), chunk_size):
+            yield greeting_pcm[start:start + chunk_size]
+        text = stripped[len(GREETING_TEXT):].strip()
+        if not text:
+            return
+    yield from _stream_kokoro(text, chunk_size)
+
+
+def _render_greeting():
+    global greeting_pcm
+    r = _kokoro_request(GREETING_TEXT, urllib3.Timeout(connect=2, total=WARM_UP_TIMEOUT))
+    try:
+        if r.status < 400:
+            greeting_pcm = r.read()
+        else:
+            r.drain_conn()
+            print(f"Init: Kokoro respondeu HTTP {r.status} ao renderizar a saudação")
+    finally:
+        r.release_conn()
+
+
+def _warm_bedrock():
+    try:
+        bedrock_runtime_client.invoke_model(modelId=MODEL_ID, body="{}")
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ValidationException":
+            print(f"Init: aquecimento do Bedrock: {e}")
+    except Exception as e:
+        print(f"Init: aquecimento do Bedrock: {e}")
+
+
+def _warm_up():
+    """
+    Abre a conexão com o Bedrock em segundo plano enquanto renderiza a
+    saudação no Kokoro (o que também deixa a conexão com ele no pool).
+    Espera no máximo WARM_UP_TIMEOUT segundos no total.
+    """
+    deadline = time.monotonic() + WARM_UP_TIMEOUT
+    if bedrock_runtime_client:
+        bedrock = threading.Thread(target=_warm_bedrock, daemon=True)
+        bedrock.start()
+    else:
+        bedrock = None
+
+    if greeting_pcm is None:
+        try:
+            _render_greeting()
+        except Exception as e:
+            print(f"Init: pré-renderização da saudação falhou: {e}")
+
+    if bedrock is not None:
+        bedrock.join(timeout=max(0, deadline - time.monotonic()))
+
+
+def _after_restore():
+    # o PCM da saudação sobrevive ao snapshot; as conexões não
+    http.clear()
+    _warm_up()
+
+
+_warm_up()
+
+if register_after_restore is not None:
+    register_after_restore(_after_restore)
 
 
 def lambda_handler(event, context):
-    if not bedrock_runtime_client or not gatewayapi or not polly_client:
+    if not bedrock_runtime_client or not gatewayapi:
         print("ERRO: Clientes AWS não inicializados.")
         return {"statusCode": 500}
 
@@ -50,13 +181,12 @@ def lambda_handler(event, context):
     history.append({"role": "user", "content": [{"type": "text", "text": prompt}]})
 
     # 2. Prepara payload Bedrock
-    model_id = "anthropic.claude-3-haiku-20240307-v1:0"
     payload = {
         "anthropic_version": "bedrock-2023-05-31",
         "max_tokens": 2048,
         "system": (
         "Você é Kora, uma assistente virtual infantil que ajuda na educação de crianças. "
-        "Sempre se apresente na primeira resposta de cada conversa dizendo: 'Oi, prazer, eu sou Kora! Estou aqui para aprendermos juntos e também para brincar! Qual o seu nome?'"
+        f"Sempre se apresente na primeira resposta de cada conversa dizendo: '{GREETING_TEXT}'"
         "Use frases curtas e linguagem simples, sem termos técnicos ou palavras difíceis. "
         "Jamais use palavrões ou linguagem ofensiva. "
         "Seja educado, amigável e positivo em todas as respostas. "
@@ -70,7 +200,7 @@ def lambda_handler(event, context):
         # 3. Invoca o modelo
         response = bedrock_runtime_client.invoke_model(
             body=json.dumps(payload),
-            modelId=model_id
+            modelId=MODEL_ID
         )
         response_json = json.loads(response.get("body").read())
         bedrock_text = response_json["content"][0]["text"]
@@ -79,43 +209,17 @@ def lambda_handler(event, context):
         # --- 4. Gera e envia o áudio completo em chunks ---
         MAX_CHUNK_SIZE = 32000
 
-        KOKORO_URL = "http://kokorotts.oraculo:8880/v1/audio/speech"  # ou IP privado da EC2
-
+        chunks = _kokoro_chunks(bedrock_text)
         try:
-            with requests.post(
-                KOKORO_URL,
-                json={
-                    "model": "kokoro",
-                    "voice": "pm_santa",
-                    "input": bedrock_text,
-                    "response_format": "pcm",
-                    "speed": 1.0
-                },
-                stream=True,
-                timeout=60
-            ) as r:
-                r.raise_for_status()
-                buffer = b""
-                for chunk in r.iter_content(chunk_size=4096):
-                    if not chunk:
-                        continue
-                    buffer += chunk
-                    while len(buffer) >= MAX_CHUNK_SIZE:
-                        part = buffer[:MAX_CHUNK_SIZE]
-                        buffer = buffer[MAX_CHUNK_SIZE:]
-                        part_b64 = base64.b64encode(part).decode("utf-8")
-                        gatewayapi.post_to_connection(
-                            ConnectionId=connection_id,
-                            Data=json.dumps({
-                                "type": "audio_chunk",
-                                "chunk": part_b64,
-                                "eof": False
-                            }).encode("utf-8")
-                        )
-
-                # Envia o restante (caso sobre algo)
-                if buffer:
-                    part_b64 = base64.b64encode(buffer).decode("utf-8")
+            buffer = b""
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                buffer += chunk
+                while len(buffer) >= MAX_CHUNK_SIZE:
+                    part = buffer[:MAX_CHUNK_SIZE]
+                    buffer = buffer[MAX_CHUNK_SIZE:]
+                    part_b64 = base64.b64encode(part).decode("utf-8")
                     gatewayapi.post_to_connection(
                         ConnectionId=connection_id,
                         Data=json.dumps({
@@ -125,16 +229,30 @@ def lambda_handler(event, context):
                         }).encode("utf-8")
                     )
 
-                # ✅ Envia sinal de fim de áudio
+            # Envia o restante (caso sobre algo)
+            if buffer:
+                part_b64 = base64.b64encode(buffer).decode("utf-8")
                 gatewayapi.post_to_connection(
                     ConnectionId=connection_id,
                     Data=json.dumps({
                         "type": "audio_chunk",
-                        "eof": True
+                        "chunk": part_b64,
+                        "eof": False
                     }).encode("utf-8")
                 )
 
+            # ✅ Envia sinal de fim de áudio
+            gatewayapi.post_to_connection(
+                ConnectionId=connection_id,
+                Data=json.dumps({
+                    "type": "audio_chunk",
+                    "eof": True
+                }).encode("utf-8")
+            )
+
         except Exception as e:
+            # fecha o stream na hora se o erro veio do post_to_connection
+            chunks.close()
             print(f"Erro ao gerar áudio via Kokoro: {e}")
             gatewayapi.post_to_connection(
                 ConnectionId=connection_id,
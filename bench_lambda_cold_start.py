@@ -0,0 +1,152 @@
+"""
+Benchmark de cold start x warm das Lambdas Python.
+
+Para cada rodada muda uma variável de ambiente da função e publica uma
+versão nova, invoca essa versão uma vez (cold) e logo em seguida de
+novo (warm), e apaga a versão. Como SnapStart só vale para versões
+publicadas, com ele ligado a primeira invocação é uma restauração do
+snapshot. Lê do log o "Init Duration" (ou "Restore Duration", com
+SnapStart) e o "Duration" reportados pela própria Lambda, além do tempo
+de parede. No fim, as variáveis de ambiente originais são restauradas.
+
+As invocações são requisições reais, que passam por banco, Bedrock e
+TTS, para a primeira chamada mostrar o ganho do aquecimento no init:
+
+    # lambdaBedrock.py (REST: banco + Bedrock + Polly)
+    python bench_lambda_cold_start.py NOME_DA_FUNCAO --codigo-robo CODIGO
+
+    # AWS-Lambda/lambda_function.py (WebSocket: Bedrock + Kokoro);
+    # precisa de um connectionId aberto, por exemplo de uma sessão wscat
+    python bench_lambda_cold_start.py NOME_DA_FUNCAO --connection-id ID
+
+Rode antes e depois de publicar uma mudança para comparar a primeira
+invocação.
+"""
+
+import argparse
+import base64
+import json
+import re
+import statistics
+import time
+import uuid
+
+import boto3
+
+REGION = "us-east-1"
+ROUNDS = 5
+
+REPORT_RE = re.compile(r"REPORT RequestId:.*?\tDuration: ([\d.]+) ms")
+# SnapStart reporta "Restore Duration" no lugar de "Init Duration"
+INIT_RE = re.compile(r"(?:Init|Restore) Duration: ([\d.]+) ms")
+
+lambda_client = boto3.client("lambda", region_name=REGION)
+
+
+def build_payload(args):
+    if args.connection_id:
+        return {
+            "requestContext": {"connectionId": args.connection_id},
+            "body": json.dumps({"action": "resposta", "prompt": args.prompt}),
+        }
+    return {
+        "body": json.dumps({
+            "action": "invokeBedrock",
+            "prompt": args.prompt,
+            "codigo_robo": args.codigo_robo,
+        }),
+    }
+
+
+def get_variables(function_name):
+    config = lambda_client.get_function_configuration(FunctionName=function_name)
+    return config.get("Environment", {}).get("Variables", {})
+
+
+def set_variables(function_name, variables):
+    lambda_client.update_function_configuration(
+        FunctionName=function_name,
+        Environment={"Variables": variables},
+    )
+    lambda_client.get_waiter("function_updated_v2").wait(FunctionName=function_name)
+
+
+def publish_cold_version(function_name, original_variables):
+    """Publica uma versão nova (sem ambientes quentes) e retorna o número."""
+    # sem mudança de configuração o publish_version devolve a versão existente
+    variables = dict(original_variables)
+    variables["BENCH_NONCE"] = uuid.uuid4().hex
+    set_variables(function_name, variables)
+
+    version = lambda_client.publish_version(FunctionName=function_name)["Version"]
+    # com SnapStart a versão só fica ativa depois de criar o snapshot
+    lambda_client.get_waiter("function_active_v2").wait(
+        FunctionName=function_name,
+        Qualifier=version,
+        WaiterConfig={"Delay": 5, "MaxAttempts": 120},
+    )
+    return version
+
+
+def invoke(function_name, version, payload):
+    t0 = time.perf_counter()
+    resp = lambda_client.invoke(
+        FunctionName=function_name,
+        Qualifier=version,
+        Payload=json.dumps(payload).encode("utf-8"),
+        LogType="Tail",
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000.0
+    result = json.loads(resp["Payload"].read() or "null")
+
+    log = base64.b64decode(resp.get("LogResult", "")).decode("utf-8", "replace")
+    duration = REPORT_RE.search(log)
+    init = INIT_RE.search(log)
+    return {
+        "status": result.get("statusCode") if isinstance(result, dict) else None,
+        "wall_ms": wall_ms,
+        "duration_ms": float(duration.group(1)) if duration else None,
+        "init_ms": float(init.group(1)) if init else 0.0,
+    }
+
+
+def _median(rows, key):
+    values = [r[key] for r in rows if r[key] is not None]
+    return statistics.median(values) if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start x warm de uma Lambda")
+    parser.add_argument("function_name")
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--prompt", default="Oi! Qual é o seu nome?")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--codigo-robo", help="código do robô (lambdaBedrock.py)")
+    target.add_argument("--connection-id", help="connectionId WebSocket aberto (lambda_function.py)")
+    args = parser.parse_args()
+
+    payload = build_payload(args)
+    original_variables = get_variables(args.function_name)
+
+    cold, warm = [], []
+    try:
+        for i in range(args.rounds):
+            version = publish_cold_version(args.function_name, original_variables)
+            try:
+                cold.append(invoke(args.function_name, version, payload))
+                warm.append(invoke(args.function_name, version, payload))
+            finally:
+                lambda_client.delete_function(FunctionName=args.function_name, Qualifier=version)
+            print(f"rodada {i + 1} (versão {version}): cold {cold[-1]} | warm {warm[-1]}")
+    finally:
+        set_variables(args.function_name, original_variables)
+
+    print(f"\n{args.function_name} ({len(cold)} rodadas, medianas):")
+    for label, rows in (("cold", cold), ("warm", warm)):
+        print(f"  {label}: init/restore {_median(rows, 'init_ms'):.1f} ms, "
+              f"handler {_median(rows, 'duration_ms'):.1f} ms, "
+              f"parede {_median(rows, 'wall_ms'):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark de inicialização do cliente (main.py).
+
+Roda o main.py várias vezes em processos novos com `-X importtime` e
+mostra:
+  - tempo do início do processo até o robô estar pronto (mediana);
+  - os imports mais caros segundo o -X importtime.
+
+"Pronto" é o mesmo ponto em que main() passa do `warmup.join()`: o
+módulo importado e os imports/clientes de prewarm_clients() prontos.
+O HEAD de rede do pré-aquecimento é medido à parte e descontado do
+"pronto", já que a versão antiga não faz nenhuma chamada de rede no
+início; assim a comparação mostra só o ganho de import/inicialização.
+Em versões sem prewarm_clients() os imports já acontecem no import do
+módulo, então pronto = import. Com --import-only mede só o `import main`.
+
+Para comparar antes/depois, rode também contra o main.py da versão
+antiga, por exemplo com um worktree do commit de referência:
+    python bench_startup.py
+    git worktree add /tmp/main-antigo <commit-de-referencia>
+    python bench_startup.py --dir /tmp/main-antigo
+    git worktree remove /tmp/main-antigo
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = 5
+TOP = 10
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# linha do -X importtime: "import time:   self [us] | cumulative | nome"
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+READY_CODE = (
+    "import time\n"
+    "import main\n"
+    "if hasattr(main, 'prewarm_clients'):\n"
+    "    main.prewarm_clients(warm_api=False).join()\n"
+    # já estão em cache se o pré-aquecimento deu certo; se a thread
+    # falhou, isto falha também em vez de medir um "pronto" falso
+    "import numpy, sounddevice\n"
+    "if hasattr(main, 'warm_api_connection'):\n"
+    "    t0 = time.perf_counter()\n"
+    "    main.warm_api_connection()\n"
+    "    print('NETWORK_MS=%.3f' % ((time.perf_counter() - t0) * 1000))\n"
+)
+
+NETWORK_RE = re.compile(r"^NETWORK_MS=([\d.]+)$", re.MULTILINE)
+
+
+def run_once(directory, code):
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=directory,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - t0
+    if proc.returncode != 0:
+        print(proc.stderr, file=sys.stderr)
+        raise SystemExit("Falha ao iniciar main.py")
+    m = NETWORK_RE.search(proc.stdout)
+    network_ms = float(m.group(1)) if m else None
+    return elapsed, network_ms, proc.stderr
+
+
+def top_imports(importtime_output):
+    # só pacotes de primeiro nível (indentação mínima), por tempo cumulativo
+    rows = []
+    for line in importtime_output.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m and len(m.group(3)) == 1:
+            rows.append((int(m.group(2)), m.group(4)))
+    rows.sort(reverse=True)
+    return rows[:TOP]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do main.py")
+    parser.add_argument("--dir", default=HERE, help="pasta com o main.py a medir")
+    parser.add_argument("--import-only", action="store_true",
+                        help="mede só o import, sem esperar o pré-aquecimento")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    args = parser.parse_args()
+
+    code = "import main" if args.import_only else READY_CODE
+    label = "import main" if args.import_only else "pronto"
+
+    times = []
+    network = []
+    last_output = ""
+    for _ in range(args.runs):
+        elapsed, network_ms, last_output = run_once(args.dir, code)
+        if network_ms is not None:
+            network.append(network_ms)
+            elapsed -= network_ms / 1000.0
+        times.append(elapsed)
+
+    print(f"{label}: mediana {statistics.median(times) * 1000:.1f} ms "
+          f"(min {min(times) * 1000:.1f} ms, {args.runs} execuções)")
+    if network:
+        print(f"rede (HEAD de pré-aquecimento, fora do \"pronto\"): "
+              f"mediana {statistics.median(network):.1f} ms")
+    print("\nImports mais caros (cumulativo, última execução):")
+    for cumulative_us, name in top_imports(last_output):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,18 @@ import json
 import boto3
 import base64
 import psycopg2
-import psycopg2.extras
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+# SnapStart: só existe no runtime da Lambda com SnapStart ligado
+try:
+    from snapshot_restore_py import register_after_restore
+except ImportError:
+    register_after_restore = None
 
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = int(os.getenv("DB_PORT", "5432"))
@@ -12,34 +22,104 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 
 conn = None
+# o init conecta em outra thread; o lock evita duas conexões ao mesmo tempo
+_conn_lock = threading.Lock()
 
 def get_connection():
     global conn
-    if conn is None or conn.closed != 0:
-        conn = psycopg2.connect(
-            host=DB_HOST,
-            port=DB_PORT,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            dbname=DB_NAME,
-        )
-    return conn
+    with _conn_lock:
+        if conn is None or conn.closed != 0:
+            conn = psycopg2.connect(
+                host=DB_HOST,
+                port=DB_PORT,
+                user=DB_USER,
+                password=DB_PASSWORD,
+                dbname=DB_NAME,
+                connect_timeout=3,
+            )
+        return conn
 
 REGION = "us-east-1"
 
+# Tempo máximo que o init espera pelo aquecimento (o init tem 10 s no total)
+WARM_UP_TIMEOUT = 4
+
+# connect curto para um endpoint fora do ar não travar o init;
+# o read_timeout continua o padrão por causa do invoke_model
+CLIENT_CONFIG = Config(connect_timeout=2)
+
 bedrock_runtime_client = boto3.client(
     service_name="bedrock-runtime",
     region_name=REGION,
+    config=CLIENT_CONFIG,
 )
 
 polly_client = boto3.client(
     service_name="polly",
     region_name=REGION,
+    config=CLIENT_CONFIG,
 )
 
 MODEL_ID = "anthropic.claude-3-haiku-20240307-v1:0"
 
 
+# --------------------------------------------------------
+# Init: tudo que é caro roda aqui, fora da primeira requisição
+# --------------------------------------------------------
+
+def _warm_bedrock():
+    # invoke_model existe em qualquer versão do botocore; com body vazio
+    # o Bedrock recusa na validação (sem custo), depois do handshake TLS
+    # e da assinatura com as credenciais
+    try:
+        bedrock_runtime_client.invoke_model(modelId=MODEL_ID, body="{}")
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ValidationException":
+            raise
+
+
+def _warm_up():
+    """
+    Abre a conexão com o banco e as conexões TLS com Bedrock e Polly
+    (resolvendo credenciais) em paralelo durante o init, esperando no
+    máximo WARM_UP_TIMEOUT segundos. Falhas só são logadas: o handler
+    refaz o que faltar.
+    """
+    tasks = {
+        "banco": get_connection,
+        "Bedrock": _warm_bedrock,
+        "Polly": lambda: polly_client.describe_voices(LanguageCode="pt-BR"),
+    }
+    executor = ThreadPoolExecutor(max_workers=len(tasks))
+    futures = {executor.submit(fn): name for name, fn in tasks.items()}
+    done, pending = wait(futures, timeout=WARM_UP_TIMEOUT)
+    for future in done:
+        if future.exception() is not None:
+            print(f"Init: aquecimento ({futures[future]}): {future.exception()}")
+    for future in pending:
+        print(f"Init: aquecimento ({futures[future]}) passou de {WARM_UP_TIMEOUT}s, seguindo sem ele")
+    # não espera as pendentes: o handler refaz o que faltar
+    executor.shutdown(wait=False)
+
+
+def _after_restore():
+    # conexões abertas antes do snapshot não sobrevivem à restauração
+    global conn
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+    conn = None
+    _warm_up()
+
+
+_warm_up()
+
+if register_after_restore is not None:
+    register_after_restore(_after_restore)
+
+
 def lambda_handler(event, context):
     # Log para debug
     connection = get_connection()
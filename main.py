@@ -1,17 +1,14 @@
 import asyncio
 import base64
 import json
+import math
+import os
 import sys
 import threading
 import time
 
-import boto3
-import numpy as np
-import requests
-import sounddevice as sd
-
-from amazon_transcribe.client import TranscribeStreamingClient
-from amazon_transcribe.handlers import TranscriptResultStreamHandler
+# numpy, sounddevice, requests e amazon_transcribe são importados sob
+# demanda (ver seção 0.5) para o cliente ficar pronto mais rápido no Pi.
 
 # =====================================
 # CONFIGURAÇÕES
@@ -30,10 +27,272 @@ SAMPLE_RATE = 16000  # taxa de amostragem do áudio que vamos mandar para o Tran
 # Sua API REST (Lambda com Bedrock + Polly)
 API_URL = "https://h5nfq4dzd2.execute-api.us-east-1.amazonaws.com/prod"  # <-- troque
 API_ACTION = "invokeBedrock"
+# (connect, read) do HEAD de pré-aquecimento: curto para não segurar
+# o primeiro turno quando a API está fora do ar
+API_WARM_TIMEOUT = (1, 2)
 
 # Tamanho dos chunks de áudio enviados ao Transcribe (em milissegundos)
 CHUNK_MS = 100
 
+# Liga o caminho microfone -> Transcribe (o loop hoje usa texto digitado)
+USE_TRANSCRIBE = False
+
+# Tracing de desempenho do cliente
+TRACE_ENABLED = os.getenv("ROBO_TRACE", "0") == "1"  # liga com ROBO_TRACE=1
+TRACE_FILE = os.getenv("ROBO_TRACE_FILE", "traces.jsonl")
+TRACE_CAPACITY = 256     # quantos turnos ficam no ring buffer
+TRACE_FLUSH_EVERY = 10   # a cada quantos turnos grava o JSONL
+TRACE_PROFILE = os.getenv("ROBO_TRACE_PROFILE", "")  # "", "cprofile" ou "tracemalloc"
+
+
+# =====================================
+# 0) TRACING DE DESEMPENHO (CLIENTE)
+# =====================================
+
+# Marcos de um turno, na ordem em que acontecem
+TRACE_EVENTS = (
+    "turn_start",
+    "capture_start",
+    "capture_end",
+    "input_done",
+    "first_partial",
+    "final_transcript",
+    "request_sent",
+    "first_byte",
+    "decode_done",
+    "playback_start",
+    "playback_end",
+)
+
+# Spans derivados dos marcos: nome -> (marco inicial, marco final)
+TRACE_SPANS = {
+    "capture": ("capture_start", "capture_end"),
+    "first_partial": ("capture_start", "first_partial"),
+    "transcribe": ("capture_end", "final_transcript"),
+    "api_ttfb": ("request_sent", "first_byte"),
+    "api_total": ("request_sent", "decode_done"),
+    "response": ("request_sent", "playback_start"),
+    "playback": ("playback_start", "playback_end"),
+    # do fim da fala/digitação até o fim da resposta: não inclui o
+    # tempo que a pessoa leva para falar ou digitar
+    "turn": ("input_done", "playback_end"),
+}
+
+
+def _percentile(sorted_values, pct):
+    # nearest-rank sobre uma lista já ordenada
+    if not sorted_values:
+        return None
+    k = max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+class TurnTracer:
+    """
+    Registra timestamps monotônicos de cada turno em um ring buffer
+    pré-alocado. A cada TRACE_FLUSH_EVERY turnos grava os turnos novos
+    em JSONL e imprime p50/p95 dos spans sobre o conteúdo do buffer.
+    """
+
+    def __init__(self, capacity=TRACE_CAPACITY, path=TRACE_FILE,
+                 flush_every=TRACE_FLUSH_EVERY, profile=TRACE_PROFILE,
+                 enabled=TRACE_ENABLED):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.path = path
+        self.flush_every = flush_every
+        self.profile = profile
+        self._index = {name: i for i, name in enumerate(TRACE_EVENTS)}
+        # slots fixos: nenhuma alocação nova durante o loop
+        self._slots = [[None] * len(TRACE_EVENTS) for _ in range(capacity)]
+        # relógio de parede do início de cada turno: o monotônico só vale
+        # dentro deste processo, o de parede alinha com os logs do servidor
+        self._wall = [None] * capacity
+        self._turns = 0        # total de turnos iniciados
+        self._flushed = 0      # total de turnos já gravados
+        self._current = None
+        self._profiler = None
+
+    def begin_turn(self):
+        if not self.enabled:
+            return
+        if self._current is not None:
+            self.end_turn()
+        pos = self._turns % self.capacity
+        slot = self._slots[pos]
+        for i in range(len(slot)):
+            slot[i] = None
+        self._current = slot
+        self._turns += 1
+        self._start_profile()
+        self.mark("turn_start")
+        self._wall[pos] = time.time()
+
+    def mark(self, event):
+        # só o primeiro registro conta (ex.: first_partial)
+        if self._current is None:
+            return
+        i = self._index[event]
+        if self._current[i] is None:
+            self._current[i] = time.monotonic()
+
+    def end_turn(self):
+        if self._current is None:
+            return
+        self._current = None
+        self._stop_profile()
+        if self._turns - self._flushed >= self.flush_every:
+            self.flush()
+
+    # ---------- perfilamento opcional por turno ----------
+
+    def _start_profile(self):
+        if self.profile == "cprofile":
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.profile == "tracemalloc":
+            import tracemalloc
+            tracemalloc.start()
+
+    def _stop_profile(self):
+        if self.profile == "cprofile" and self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(f"turn_{self._turns}.prof")
+            self._profiler = None
+        elif self.profile == "tracemalloc":
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                print(f"[TRACE] turno {self._turns} - top alocações:")
+                for stat in snapshot.statistics("lineno")[:10]:
+                    print("   ", stat)
+
+    # ---------- saída ----------
+
+    def _spans(self, slot):
+        spans = {}
+        for name, (start, end) in TRACE_SPANS.items():
+            t0 = slot[self._index[start]]
+            t1 = slot[self._index[end]]
+            if t0 is not None and t1 is not None:
+                spans[name] = round((t1 - t0) * 1000.0, 2)
+        return spans
+
+    def _completed_slots(self):
+        # turnos finalizados ainda presentes no buffer, do mais antigo ao mais novo
+        done = self._turns - (1 if self._current is not None else 0)
+        first = max(0, done - self.capacity)
+        return [(n + 1, self._slots[n % self.capacity]) for n in range(first, done)]
+
+    def summary(self):
+        values = {name: [] for name in TRACE_SPANS}
+        for _, slot in self._completed_slots():
+            for name, ms in self._spans(slot).items():
+                values[name].append(ms)
+        result = {}
+        for name, samples in values.items():
+            if samples:
+                samples.sort()
+                result[name] = {
+                    "n": len(samples),
+                    "p50": _percentile(samples, 50),
+                    "p95": _percentile(samples, 95),
+                }
+        return result
+
+    def flush(self):
+        if not self.enabled:
+            return
+        pending = [(n, s) for n, s in self._completed_slots() if n > self._flushed]
+        if pending:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for n, slot in pending:
+                    t0 = slot[0]
+                    events = {
+                        name: round((slot[i] - t0) * 1000.0, 2)
+                        for i, name in enumerate(TRACE_EVENTS)
+                        if slot[i] is not None
+                    }
+                    f.write(json.dumps({
+                        "turn": n,
+                        "turn_start_epoch": self._wall[(n - 1) % self.capacity],
+                        "events_ms": events,
+                        "spans_ms": self._spans(slot),
+                    }) + "\n")
+            self._flushed = pending[-1][0]
+            for name, stats in self.summary().items():
+                print(f"[TRACE] {name}: p50={stats['p50']} ms p95={stats['p95']} ms (n={stats['n']})")
+
+
+tracer = TurnTracer()
+
+
+# =====================================
+# 0.5) CLIENTES DE LONGA DURAÇÃO E PRÉ-AQUECIMENTO
+# =====================================
+
+_clients_lock = threading.Lock()
+_http_session = None
+_transcribe_client = None
+_handler_class = None
+
+
+def get_http_session():
+    """Sessão HTTP única: reaproveita a conexão TLS com a API entre turnos."""
+    global _http_session
+    with _clients_lock:
+        if _http_session is None:
+            import requests
+            _http_session = requests.Session()
+        return _http_session
+
+
+def get_transcribe_client():
+    """Cliente do Transcribe Streaming criado uma vez e reutilizado."""
+    global _transcribe_client
+    with _clients_lock:
+        if _transcribe_client is None:
+            from amazon_transcribe.client import TranscribeStreamingClient
+            _transcribe_client = TranscribeStreamingClient(region=REGION)
+        return _transcribe_client
+
+
+def warm_api_connection():
+    """Abre a conexão TLS com a API; o status da resposta não importa."""
+    try:
+        get_http_session().head(API_URL, timeout=API_WARM_TIMEOUT)
+    except Exception as e:
+        print(f"[WARN] pré-aquecimento da API falhou: {e}", file=sys.stderr)
+
+
+def prewarm_clients(warm_api=True):
+    """
+    Importa as bibliotecas pesadas e abre a conexão com a API em uma
+    thread de fundo, enquanto o usuário interage com o robô.
+    Com warm_api=False pula a parte de rede (usado no benchmark).
+    Retorna a thread para quem quiser esperar por ela.
+    """
+    def worker():
+        t0 = time.monotonic()
+        import numpy  # noqa: F401
+        import sounddevice  # noqa: F401
+
+        get_http_session()
+        if warm_api:
+            warm_api_connection()
+
+        if USE_TRANSCRIBE:
+            get_transcribe_client()
+            _transcript_handler_class()
+
+        print(f"[INIT] clientes prontos em {time.monotonic() - t0:.2f}s")
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
+
 
 # =====================================
 # 1) GRAVAÇÃO DO MICROFONE (ENTER/ENTER)
@@ -45,6 +304,9 @@ def record_audio_until_enter():
     Pressione ENTER novamente para parar.
     Retorna um numpy array int16 com o áudio gravado (mono, SAMPLE_RATE).
     """
+    import numpy as np
+    import sounddevice as sd
+
     print("Pressione ENTER para começar a gravar (ou 'q' + ENTER para sair).")
     cmd = input().strip().lower()
     if cmd == "q":
@@ -74,8 +336,11 @@ def record_audio_until_enter():
         dtype="float32",
         callback=callback,
     ):
+        tracer.mark("capture_start")
         while not stop_flag["stop"]:
             time.sleep(0.05)
+    tracer.mark("capture_end")
+    tracer.mark("input_done")
 
     print("Gravação encerrada.")
 
@@ -94,37 +359,50 @@ def record_audio_until_enter():
 # 2) HANDLER DO TRANSCRIBE STREAMING
 # =====================================
 
-class MyTranscriptHandler(TranscriptResultStreamHandler):
-    def __init__(self, stream):
-        super().__init__(stream)
-        self.segments = []
+def _transcript_handler_class():
+    # A classe base vem do amazon_transcribe, então a classe é montada
+    # só na primeira vez que o Transcribe for usado.
+    global _handler_class
+    if _handler_class is not None:
+        return _handler_class
 
-    async def handle_transcript_event(self, transcript_event):
-        # Chamado toda vez que chegam resultados de transcrição
-        for result in transcript_event.transcript.results:
-            if result.is_partial:
-                # Ignora parciais; pega só finais
-                continue
-            for alt in result.alternatives:
-                text = alt.transcript
-                self.segments.append(text)
+    from amazon_transcribe.handlers import TranscriptResultStreamHandler
 
-    def get_full_text(self) -> str:
-        # Junta segmentos em um único texto
-        return " ".join(self.segments).strip()
+    class MyTranscriptHandler(TranscriptResultStreamHandler):
+        def __init__(self, stream):
+            super().__init__(stream)
+            self.segments = []
+
+        async def handle_transcript_event(self, transcript_event):
+            # Chamado toda vez que chegam resultados de transcrição
+            for result in transcript_event.transcript.results:
+                if result.is_partial:
+                    # Ignora parciais; pega só finais
+                    tracer.mark("first_partial")
+                    continue
+                for alt in result.alternatives:
+                    text = alt.transcript
+                    self.segments.append(text)
+
+        def get_full_text(self) -> str:
+            # Junta segmentos em um único texto
+            return " ".join(self.segments).strip()
+
+    _handler_class = MyTranscriptHandler
+    return _handler_class
 
 
 # =====================================
 # 3) ENVIAR ÁUDIO GRAVADO PARA O TRANSCRIBE VIA STREAMING
 # =====================================
 
-async def transcribe_with_streaming(audio_int16: np.ndarray) -> str:
+async def transcribe_with_streaming(audio_int16) -> str:
     """
     Envia o áudio (int16, PCM, mono) para o Amazon Transcribe Streaming
     e retorna o texto transcrito.
     NÃO usa S3. O áudio é "streamado" diretamente daqui.
     """
-    client = TranscribeStreamingClient(region=REGION)
+    client = get_transcribe_client()
 
     stream = await client.start_stream_transcription(
         language_code=LANGUAGE_CODE,
@@ -132,7 +410,7 @@ async def transcribe_with_streaming(audio_int16: np.ndarray) -> str:
         media_encoding="pcm",
     )
 
-    handler = MyTranscriptHandler(stream.output_stream)
+    handler = _transcript_handler_class()(stream.output_stream)
 
     # função para enviar os chunks de áudio
     async def write_chunks():
@@ -159,6 +437,7 @@ async def transcribe_with_streaming(audio_int16: np.ndarray) -> str:
     )
 
     text = handler.get_full_text()
+    tracer.mark("final_transcript")
     print("Texto transcrito:", text)
     return text
 
@@ -176,7 +455,10 @@ def call_bedrock_polly_api(prompt_text: str, history: list, cod_robo: str):
     }
 
     print("Chamando API REST:", API_URL)
-    resp = requests.post(API_URL, json=payload)
+    tracer.mark("request_sent")
+    # stream=True: post() retorna assim que chegam os cabeçalhos
+    resp = get_http_session().post(API_URL, json=payload, stream=True)
+    tracer.mark("first_byte")
 
     print("Status:", resp.status_code)
     print("Resposta bruta (inicio):", resp.text[:300], "...\n")
@@ -204,6 +486,7 @@ def call_bedrock_polly_api(prompt_text: str, history: list, cod_robo: str):
         raise RuntimeError("Resposta da API não contém 'audio_base64'.")
 
     audio_bytes = base64.b64decode(audio_b64)
+    tracer.mark("decode_done")
     print("Texto da IA:", resposta_texto)
     return resposta_texto, audio_bytes, sample_rate, updated_history
 
@@ -217,10 +500,15 @@ def play_pcm(audio_bytes: bytes, sample_rate: int):
     """
     Toca áudio PCM 16-bit little endian, mono, vindo da API.
     """
+    import numpy as np
+    import sounddevice as sd
+
     samples = np.frombuffer(audio_bytes, dtype=np.int16)
     print(f"Tocando áudio ({len(samples)} amostras, {sample_rate} Hz)...")
+    tracer.mark("playback_start")
     sd.play(samples, samplerate=sample_rate)
     sd.wait()
+    tracer.mark("playback_end")
     print("Reprodução concluída.")
 
 
@@ -231,9 +519,13 @@ def play_pcm(audio_bytes: bytes, sample_rate: int):
 async def main():
     global conversation_history
     global codigo_robo 
+    # aquece imports e conexões enquanto o código do robô é digitado
+    warmup = prewarm_clients()
     codigo_robo = input("Digite o codigo do robo")
+    warmup.join()
     
     while True:
+        tracer.begin_turn()
 
 #        audio_int16, quit_flag = record_audio_until_enter()
 #        if quit_flag:
@@ -249,6 +541,7 @@ async def main():
 #            continue
             
         user_text = input("Escreva alguma coisa: ")
+        tracer.mark("input_done")
 
         # envia texto + histórico acumulado
         resposta_texto, audio_bytes, sr, updated_history = call_bedrock_polly_api(
@@ -262,8 +555,12 @@ async def main():
 
         # toca o áudio
         play_pcm(audio_bytes, sr)
+        tracer.end_turn()
 
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    finally:
+        tracer.flush()